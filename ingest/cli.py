@@ -4,7 +4,7 @@ import argparse
 
 from .config import load_config
 from .output import save_citations
-from .scholar import scrape_user_citations
+from .scholar import MAX_PAGE_SIZE, load_browser_cookies, scrape_user_citations
 
 
 def main() -> None:
@@ -28,18 +28,42 @@ def main() -> None:
         default="results/citations.json",
         help="Output JSON file path (default: results/citations.json)",
     )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=MAX_PAGE_SIZE,
+        help=f"Papers per profile page, 1 to {MAX_PAGE_SIZE}; lower it if rate limited (default: {MAX_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Fetch every page from Google Scholar instead of using the .cache/ directory",
+    )
 
     args = parser.parse_args()
 
+    if not 1 <= args.page_size <= MAX_PAGE_SIZE:
+        parser.error(f"--page-size must be between 1 and {MAX_PAGE_SIZE}")
+
     # Load configuration
     config = load_config(args.config)
 
     # Command line user ID overrides config
     user_id = args.user or config["user_id"]
     delay = config.get("request_delay", 2)
+    workers = config.get("workers", 4)
+
+    # Load browser cookies once, before any requests
+    load_browser_cookies()
 
     # Scrape citations
-    papers = scrape_user_citations(user_id, delay)
+    papers = scrape_user_citations(
+        user_id,
+        delay,
+        workers,
+        use_cache=not args.no_cache,
+        page_size=args.page_size,
+    )
 
     # Save output
     save_citations(papers, user_id, args.output)
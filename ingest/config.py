@@ -8,6 +8,7 @@ from pathlib import Path
 DEFAULT_CONFIG = {
     "user_id": "RIi-1pAAAAAJ",
     "request_delay": 2,
+    "workers": 4,
 }
 
 
@@ -1,38 +1,51 @@
 """JSON output handling."""
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 
+import orjson
+
 from .scholar import Paper
 
 
+def _paper_dict(paper: Paper) -> dict:
+    """Convert a Paper to its JSON form, omitting fetched_at when unknown."""
+    data = {
+        "title": paper.title,
+        "total_citations": paper.total_citations,
+        "citations_by_year": paper.citations_by_year,
+    }
+    if paper.fetched_at is not None:
+        data["fetched_at"] = paper.fetched_at.isoformat()
+    return data
+
+
 def save_citations(papers: list[Paper], user_id: str, output_path: str = "results/citations.json") -> None:
     """Save citation data to JSON file.
 
+    Cached citation pages can differ in age, so each paper records its own
+    fetched_at, which the model uses to scale its partial current year.
+    scraped_at is when the oldest of those pages was fetched.
+
     Args:
         papers: List of Paper objects with citation data.
         user_id: Google Scholar user ID.
         output_path: Path to output JSON file.
     """
+    fetch_times = [paper.fetched_at for paper in papers if paper.fetched_at is not None]
+    scraped_at = min(fetch_times, default=datetime.now(timezone.utc))
+
     data = {
         "user_id": user_id,
-        "scraped_at": datetime.now(timezone.utc).isoformat(),
-        "papers": [
-            {
-                "title": paper.title,
-                "total_citations": paper.total_citations,
-                "citations_by_year": paper.citations_by_year,
-            }
-            for paper in papers
-        ],
+        "scraped_at": scraped_at.isoformat(),
+        "papers": [_paper_dict(paper) for paper in papers],
     }
 
     # Ensure output directory exists
     output = Path(output_path)
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output, "w") as f:
-        json.dump(data, f, indent=2)
+    with open(output, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     print(f"Saved citation data to {output_path}")
@@ -2,12 +2,26 @@
 
 from __future__ import annotations
 
+import functools
+import gzip
+import hashlib
+import os
+import random
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml.etree import XPath
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     import browser_cookie3
@@ -20,15 +34,77 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
 }
 
-# Create a session to maintain cookies
+# Precompiled XPath selectors for the profile and citation pages
+_ROW_XP = XPath("//tr[contains(@class,'gsc_a_tr')]")
+_TITLE_XP = XPath(".//a[contains(@class,'gsc_a_at')]")
+_TITLE_OCI = XPath("//*[@id='gsc_oci_title']//text()")
+_CITED_BY_XP = XPath("//a[contains(., 'Cited by')]")
+
+# Precompiled patterns for pulling IDs and counts out of links and labels
+_CITATION_ID_RE = re.compile(r"citation_for_view=([^&]+)")
+_CITED_BY_RE = re.compile(r"Cited by (\d+)")
+
+# Histogram bars link to a single-year search and wrap the count in a span:
+#   <a href="...as_ylo=2020&amp;as_yhi=2020" ...><span class="gsc_oci_g_al">42</span></a>
+# Matched on the raw page bytes, which is much cheaper than walking the DOM.
+# Like the span.gsc_oci_g_al selector it replaced, the class may be one of several
+_BAR_RE = re.compile(
+    rb'as_ylo=(\d{4})&(?:amp;)?as_yhi=\1[^>]*>[^<]*'
+    rb'<span[^>]*class="[^"]*\bgsc_oci_g_al\b[^"]*"[^>]*>(\d+)</span>'
+)
+
+# Create a session to maintain cookies and reuse keep-alive connections
 session = requests.Session()
 session.headers.update(HEADERS)
+session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        # Retries transient server errors with backoff. 429s are left to
+        # fetch_with_retry, so every rate-limited attempt goes through
+        # rate_limiter and Retry-After is honored once; urllib3 would
+        # otherwise still retry any 429 that carries a Retry-After header
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=[500, 502, 503, 504],
+            respect_retry_after_header=False,
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# Largest profile page Scholar serves; bigger requests still return this many
+MAX_PAGE_SIZE = 100
+
+# On-disk cache of fetched pages, so re-runs don't repeat every request
+CACHE_DIR = Path(".cache")
+CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+
+RATE_LIMIT_MESSAGE = (
+    "Google Scholar is rate limiting requests. "
+    "Try again in a few hours, or visit scholar.google.com in a browser "
+    "to solve the CAPTCHA, then retry."
+)
+
+
+@functools.lru_cache(maxsize=1)
+def load_browser_cookies() -> bool:
+    """Load cookies from browser for google.com domain.
 
+    Browser cookie stores are slow to read (and may prompt for Keychain access
+    on macOS), so this only runs once per process. Set
+    SCHOLAR_NO_BROWSER_COOKIES=1 to skip it entirely, e.g. in CI.
+    """
+    if os.environ.get("SCHOLAR_NO_BROWSER_COOKIES") == "1":
+        print("SCHOLAR_NO_BROWSER_COOKIES set, skipping browser cookies")
+        return False
 
-def load_browser_cookies() -> bool:
-    """Load cookies from browser for google.com domain."""
     if not HAS_BROWSER_COOKIES:
         print("browser_cookie3 not installed, skipping browser cookies")
         return False
@@ -58,12 +134,71 @@ class RateLimitError(Exception):
     pass
 
 
+class RateLimiter:
+    """Space out requests shared across threads to one per interval."""
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        """Block until the caller is allowed to issue its next request."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def defer(self, seconds: float) -> None:
+        """Hold back every caller's next request by at least ``seconds``.
+
+        Used when Scholar throttles one worker, so the whole pool backs off
+        together instead of each thread running into the block on its own.
+        """
+        with self._lock:
+            self._next_time = max(self._next_time, time.monotonic() + seconds)
+
+
+# Shared across worker threads so concurrent fetches keep the serial request rate
+rate_limiter = RateLimiter()
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(int(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+
 def fetch_with_retry(url: str, max_retries: int = 5, base_delay: float = 10, verbose: bool = True) -> requests.Response:
-    """Fetch URL with exponential backoff on 429 errors."""
+    """Fetch URL, backing off when Google Scholar rate limits the request.
+
+    Transient 5xx responses are already retried by the session's urllib3
+    adapter. This loop handles rate limiting: 429 responses and redirects
+    to the /sorry/ CAPTCHA page. Each attempt waits on rate_limiter, and
+    each backoff honors the Retry-After header when present, falling back
+    to base_delay * 2**attempt, plus up to 25% random jitter so concurrent
+    workers don't retry in lockstep. The backoff is also applied to
+    rate_limiter, pausing every worker rather than just this one.
+    """
     if verbose:
         print(f"  Fetching: {url}")
 
     for attempt in range(max_retries):
+        rate_limiter.wait()
         response = session.get(url)
 
         if verbose:
@@ -72,16 +207,15 @@ def fetch_with_retry(url: str, max_retries: int = 5, base_delay: float = 10, ver
         # Check for rate limiting (429 or redirect to /sorry CAPTCHA page)
         if response.status_code == 429 or "/sorry/" in response.url:
             if attempt < max_retries - 1:
-                wait_time = base_delay * (2 ** attempt)
-                print(f"  Rate limited, waiting {wait_time}s before retry ({attempt + 1}/{max_retries})...")
+                retry_after = _retry_after_seconds(response)
+                wait_time = max(retry_after if retry_after is not None else base_delay * (2 ** attempt), 1)
+                wait_time += random.uniform(0, wait_time * 0.25)
+                print(f"  Rate limited, waiting {wait_time:.1f}s before retry ({attempt + 1}/{max_retries})...")
+                rate_limiter.defer(wait_time)
                 time.sleep(wait_time)
                 continue
             else:
-                raise RateLimitError(
-                    "Google Scholar is rate limiting requests. "
-                    "Try again in a few hours, or visit scholar.google.com in a browser "
-                    "to solve the CAPTCHA, then retry."
-                )
+                raise RateLimitError(RATE_LIMIT_MESSAGE)
 
         response.raise_for_status()
         return response
@@ -89,6 +223,48 @@ def fetch_with_retry(url: str, max_retries: int = 5, base_delay: float = 10, ver
     raise RateLimitError("Failed after max retries due to rate limiting")
 
 
+def fetch_html(url: str, use_cache: bool = True) -> tuple[bytes, datetime]:
+    """Fetch page bytes, serving them from the on-disk cache when fresh.
+
+    Pages are stored gzipped under CACHE_DIR, keyed by a hash of the URL,
+    and refetched once they're older than CACHE_MAX_AGE.
+
+    Args:
+        url: Page URL.
+        use_cache: Whether to read from and write to the cache.
+
+    Returns:
+        Tuple of (raw response body, when it was fetched from Scholar).
+    """
+    path = CACHE_DIR / f"{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}.html.gz"
+
+    if use_cache and path.exists():
+        mtime = path.stat().st_mtime
+        if time.time() - mtime < CACHE_MAX_AGE:
+            print(f"  Using cached: {url}")
+            content = gzip.decompress(path.read_bytes())
+            return content, datetime.fromtimestamp(mtime, timezone.utc)
+
+    fetched_at = datetime.now(timezone.utc)
+    content = fetch_with_retry(url).content
+
+    if use_cache:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write then rename so an interrupted run never leaves a truncated entry
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(gzip.compress(content))
+        tmp.replace(path)
+
+    return content, fetched_at
+
+
+def _parse_html(content: bytes) -> lxml.html.HtmlElement:
+    """Parse raw page bytes; Scholar serves UTF-8 but doesn't always declare it."""
+    # Parsers aren't thread-safe, so build one per page rather than sharing
+    parser = lxml.html.HTMLParser(encoding="utf-8")
+    return lxml.html.fromstring(content, parser=parser)
+
+
 @dataclass
 class Paper:
     """Represents a paper with citation data."""
@@ -97,40 +273,51 @@ class Paper:
     citation_id: str
     total_citations: int
     citations_by_year: dict[str, int]
+    # When the citation page was fetched from Scholar (possibly via the cache)
+    fetched_at: Optional[datetime] = None
 
 
-def fetch_paper_list(user_id: str, delay: float = 5) -> list[dict]:
+def fetch_paper_list(
+    user_id: str, delay: float = 5, use_cache: bool = True, page_size: int = MAX_PAGE_SIZE
+) -> list[dict]:
     """Fetch list of all papers for a Google Scholar user.
 
     Args:
         user_id: Google Scholar user ID.
         delay: Seconds to wait between paginated requests.
+        use_cache: Whether to use the on-disk page cache.
+        page_size: Papers per profile page, from 1 to MAX_PAGE_SIZE.
 
     Returns:
         List of dicts with 'title' and 'citation_id' for each paper.
     """
+    # A short page marks the end of the list, so a page_size Scholar can't
+    # honor would stop early (or, if <= 0, never advance)
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}, got {page_size}")
+
     papers = []
     start = 0
-    page_size = 20  # Use smaller page size to reduce rate limiting
 
     while True:
         url = f"{BASE_URL}/citations?user={user_id}&hl=en&cstart={start}&pagesize={page_size}"
-        response = fetch_with_retry(url)
+        content, _ = fetch_html(url, use_cache)
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        tree = _parse_html(content)
 
         # Find paper entries in the table
-        rows = soup.select("tr.gsc_a_tr")
+        rows = _ROW_XP(tree)
         if not rows:
             break
 
         for row in rows:
-            title_link = row.select_one("a.gsc_a_at")
-            if title_link:
-                title = title_link.get_text(strip=True)
+            title_links = _TITLE_XP(row)
+            if title_links:
+                title_link = title_links[0]
+                title = "".join(title_link.itertext()).strip()
                 href = title_link.get("href", "")
                 # Extract citation_for_view ID from href
-                match = re.search(r"citation_for_view=([^&]+)", href)
+                match = _CITATION_ID_RE.search(href)
                 if match:
                     citation_id = match.group(1)
                     papers.append({"title": title, "citation_id": citation_id})
@@ -145,81 +332,85 @@ def fetch_paper_list(user_id: str, delay: float = 5) -> list[dict]:
     return papers
 
 
-def fetch_paper_citations(user_id: str, citation_id: str) -> Paper:
+def fetch_paper_citations(user_id: str, citation_id: str, use_cache: bool = True) -> Paper:
     """Fetch citation details for a specific paper.
 
     Args:
         user_id: Google Scholar user ID.
         citation_id: The citation_for_view ID for the paper.
+        use_cache: Whether to use the on-disk page cache.
 
     Returns:
         Paper object with title, total citations, and yearly breakdown.
     """
     url = f"{BASE_URL}/citations?view_op=view_citation&hl=en&user={user_id}&citation_for_view={citation_id}"
-    response = fetch_with_retry(url)
+    content, fetched_at = fetch_html(url, use_cache)
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    tree = _parse_html(content)
 
     # Get paper title
-    title_elem = soup.select_one("#gsc_oci_title")
-    title = title_elem.get_text(strip=True) if title_elem else "Unknown"
+    title = "".join(_TITLE_OCI(tree)).strip() or "Unknown"
 
     # Get total citations
     total_citations = 0
-    cited_by = soup.select_one("a:-soup-contains('Cited by')")
+    cited_by = _CITED_BY_XP(tree)
     if cited_by:
-        match = re.search(r"Cited by (\d+)", cited_by.get_text())
+        match = _CITED_BY_RE.search(cited_by[0].text_content())
         if match:
             total_citations = int(match.group(1))
 
     # Get citations by year from the histogram
-    citations_by_year = {}
-    graph_bars = soup.select("#gsc_oci_graph_bars a")
-    for bar in graph_bars:
-        href = bar.get("href", "")
-        year_match = re.search(r"as_ylo=(\d{4})&as_yhi=(\d{4})", href)
-        if year_match and year_match.group(1) == year_match.group(2):
-            year = year_match.group(1)
-            # Get citation count from the span
-            count_span = bar.select_one("span.gsc_oci_g_al")
-            if count_span:
-                try:
-                    count = int(count_span.get_text(strip=True))
-                    citations_by_year[year] = count
-                except ValueError:
-                    pass
+    citations_by_year = {
+        year.decode(): int(count) for year, count in _BAR_RE.findall(content)
+    }
 
     return Paper(
         title=title,
         citation_id=citation_id,
         total_citations=total_citations,
         citations_by_year=citations_by_year,
+        fetched_at=fetched_at,
     )
 
 
-def scrape_user_citations(user_id: str, delay: float = 5) -> list[Paper]:
+def scrape_user_citations(
+    user_id: str,
+    delay: float = 5,
+    workers: int = 4,
+    use_cache: bool = True,
+    page_size: int = MAX_PAGE_SIZE,
+) -> list[Paper]:
     """Scrape all citation data for a Google Scholar user.
 
+    Paper pages are fetched concurrently, but requests are still spaced
+    ``delay`` seconds apart across all workers.
+
     Args:
         user_id: Google Scholar user ID.
         delay: Seconds to wait between requests.
+        workers: Number of paper pages to fetch concurrently.
+        use_cache: Whether to use the on-disk page cache.
+        page_size: Papers per profile page when listing papers.
 
     Returns:
         List of Paper objects with citation data.
     """
-    # Try to load browser cookies for authentication
+    # Try to load browser cookies for authentication (no-op if already loaded)
     load_browser_cookies()
 
     print(f"Fetching paper list for user {user_id}...")
-    paper_list = fetch_paper_list(user_id, delay)
+    paper_list = fetch_paper_list(user_id, delay, use_cache, page_size)
     print(f"Found {len(paper_list)} papers")
 
-    papers = []
-    for i, paper_info in enumerate(paper_list, 1):
+    rate_limiter.interval = delay
+
+    def fetch(item: tuple[int, dict]) -> Paper:
+        i, paper_info = item
         print(f"Fetching citations for paper {i}/{len(paper_list)}: {paper_info['title'][:50]}...")
-        paper = fetch_paper_citations(user_id, paper_info["citation_id"])
-        papers.append(paper)
-        if i < len(paper_list):
-            time.sleep(delay)
+        return fetch_paper_citations(user_id, paper_info["citation_id"], use_cache)
+
+    # executor.map yields results in input order
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        papers = list(executor.map(fetch, enumerate(paper_list, 1)))
 
     return papers
@@ -0,0 +1,53 @@
+"""Reading scraped citations.json files, shared by the rates and tuning CLIs."""
+
+from __future__ import annotations
+
+from typing import IO, Any, Iterator
+
+import orjson
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+# Top-level fields load_citations returns alongside the papers
+HEADER_KEYS = ("user_id", "scraped_at")
+
+
+def load_citations(f: IO[bytes]) -> tuple[dict[str, Any], Iterator[dict[str, Any]]]:
+    """Read a citations.json file, streaming the papers if ijson is installed.
+
+    Only the HEADER_KEYS fields are returned as the header, whichever path
+    reads the file: with ijson, fields after the paper list are never read.
+
+    Args:
+        f: Citations file opened in binary mode.
+
+    Returns:
+        Tuple of (HEADER_KEYS fields present in the file, iterator over paper dicts).
+    """
+    if not HAS_IJSON:
+        data = orjson.loads(f.read())
+        header = {key: data[key] for key in HEADER_KEYS if key in data}
+        return header, iter(data.get("papers", []))
+
+    # The scraper writes user_id and scraped_at ahead of papers, so this
+    # usually stops before reaching the paper list
+    header = {}
+    papers = None
+    for key, value in ijson.kvitems(f, "", use_float=True):
+        if key == "papers":
+            papers = value
+        elif key in HEADER_KEYS:
+            header[key] = value
+            if len(header) == len(HEADER_KEYS):
+                break
+
+    if papers is not None:
+        return header, iter(papers)
+
+    f.seek(0)
+    return header, ijson.items(f, "papers.item", use_float=True)
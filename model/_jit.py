@@ -0,0 +1,27 @@
+"""Optional Numba JIT compilation.
+
+Kernels decorated with ``njit`` are compiled when numba is installed and run
+as plain Python (and NumPy) otherwise.
+"""
+
+from __future__ import annotations
+
+try:
+    from numba import njit, prange, set_num_threads
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def set_num_threads(n: int) -> None:
+        """Stand-in for numba.set_num_threads; there are no threads to size."""
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(fn):
+            return fn
+
+        return decorator
@@ -0,0 +1,21 @@
+"""Conversion of scraped citations_by_year dicts to arrays."""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def years_counts(citations: dict[str, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Split a citations_by_year dict into sorted years and their counts.
+
+    Args:
+        citations: Mapping of year (as a string) to citation count.
+
+    Returns:
+        Tuple of (years as int32, counts as float64), sorted by year.
+    """
+    items = sorted((int(y), v) for y, v in citations.items())
+    n = len(items)
+    years = np.fromiter((y for y, _ in items), dtype=np.int32, count=n)
+    counts = np.fromiter((v for _, v in items), dtype=np.float64, count=n)
+    return years, counts
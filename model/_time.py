@@ -0,0 +1,64 @@
+"""Scrape timestamp helpers shared by the rates and tuning CLIs."""
+
+from __future__ import annotations
+
+import calendar
+import functools
+from datetime import datetime
+from typing import Any, Optional
+
+
+@functools.lru_cache(maxsize=None)
+def parse_scraped_at(scraped_at_str: str) -> datetime:
+    """Parse scraped_at timestamp to timezone-aware datetime."""
+    # Handle ISO format with timezone
+    if scraped_at_str.endswith("Z"):
+        scraped_at_str = scraped_at_str[:-1] + "+00:00"
+    return datetime.fromisoformat(scraped_at_str)
+
+
+def compute_exposure_fraction(scraped_at: datetime) -> float:
+    """Compute fraction of current year that has been observed.
+
+    Not cached: aware datetimes hash by UTC instant, but the result depends
+    on scraped_at's local date and time.
+
+    Returns:
+        Fraction between 0 and 1 representing how much of the year has passed.
+    """
+    # Days elapsed since Jan 1 in scraped_at's own timezone
+    elapsed_days = (
+        scraped_at.timetuple().tm_yday - 1
+        + scraped_at.hour / 24
+        + scraped_at.minute / 1440
+        + (scraped_at.second + scraped_at.microsecond / 1e6) / 86400
+    )
+    days_in_year = 366 if calendar.isleap(scraped_at.year) else 365
+
+    fraction = elapsed_days / days_in_year
+
+    # Sanity check
+    if not (0.0 < fraction <= 1.0):
+        return 1.0
+
+    return fraction
+
+
+def paper_scraped_at(
+    paper: dict[str, Any],
+    scraped_at: datetime,
+    exposure_frac: Optional[float] = None,
+) -> tuple[datetime, Optional[float]]:
+    """Return when a paper's counts were fetched, and its exposure fraction.
+
+    Cached citation pages can differ in age, so the scraper records each
+    paper's fetched_at. Papers without one (older files) fall back to the
+    file-level scraped_at and the caller's exposure_frac for it.
+
+    Returns:
+        Tuple of (fetch time, exposure fraction or None if not yet known).
+    """
+    fetched_at = paper.get("fetched_at")
+    if fetched_at is None:
+        return scraped_at, exposure_frac
+    return parse_scraped_at(fetched_at), None
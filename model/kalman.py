@@ -5,14 +5,34 @@ Implements a local-level (random walk) state-space model:
 - Observation: z_t = x_t + eta_t, eta_t ~ N(0, R_t)
 
 Supports time-varying observation variance for Poisson-like count data.
+
+States and variances are computed in float32: the inputs are log citation
+rates with little meaningful precision and the scalar recursion is
+numerically benign. Log-likelihoods are accumulated in float64.
 """
 
 from __future__ import annotations
 
+import math
 from typing import Union
 
 import numpy as np
 
+from ._jit import HAS_NUMBA, njit, prange
+
+# Constant term of the Gaussian log-density (a compile-time constant under numba)
+LOG_2PI = math.log(2.0 * math.pi)
+
+# Without numba, series at least this long are smoothed with the log-depth
+# scan, whose vectorized rounds beat the interpreted sequential loop; the
+# compiled loop is faster at every length
+SCAN_MIN_LENGTH = 64
+
+
+def use_scan_smoother(T: int) -> bool:
+    """Whether kalman_smoother_1d_scan is the faster smoother for length T."""
+    return not HAS_NUMBA and T >= SCAN_MIN_LENGTH
+
 
 def compute_obs_variance(
     empirical_rate: np.ndarray,
@@ -34,9 +54,108 @@ def compute_obs_variance(
     Returns:
         Array of observation variances R_t for each time point.
     """
-    base_R = 1.0 / (empirical_rate + min_count)
-    R_t = overdispersion * base_R + sigma_min_sq
-    return R_t
+    return obs_variance_from_shifted(empirical_rate + min_count, overdispersion, sigma_min_sq)
+
+
+def obs_variance_from_shifted(
+    shifted_rate: np.ndarray,
+    overdispersion: float = 1.0,
+    sigma_min_sq: float = 0.01,
+) -> np.ndarray:
+    """Compute observation variance from rates that already include the pseudocount.
+
+    Same as compute_obs_variance, for callers that have ``rate + min_count``
+    on hand (it's also the argument of the log transform).
+
+    Args:
+        shifted_rate: Annualized citation rates plus pseudocount.
+        overdispersion: Global overdispersion factor φ.
+        sigma_min_sq: Floor variance to prevent R_t from getting too small.
+
+    Returns:
+        Array of observation variances R_t for each time point.
+    """
+    return overdispersion / shifted_rate + sigma_min_sq
+
+
+@njit(cache=True, fastmath=True)
+def _kalman_forward_core(
+    z: np.ndarray,
+    R: np.ndarray,
+    Q: float,
+    x0_mean: float,
+    x0_var: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, float]:
+    """Forward Kalman recursion over float32 arrays z and R (compiled by numba)."""
+    T = z.shape[0]
+
+    # Storage (same dtype as z)
+    x_pred = np.zeros_like(z)
+    P_pred = np.zeros_like(z)
+    x_filt = np.zeros_like(z)
+    P_filt = np.zeros_like(z)
+
+    # Log-likelihood accumulator (float64)
+    log_lik = 0.0
+
+    # Forward pass (Kalman filter), specialized to F = H = 1
+    x_filt_prev = x0_mean
+    P_filt_prev = x0_var
+    for t in range(T):
+        if t == 0:
+            # Initialize with prior
+            x_pred_t = x0_mean
+            P_pred_t = x0_var
+        else:
+            # Predict
+            x_pred_t = x_filt_prev
+            P_pred_t = P_filt_prev + Q
+
+        # Innovation (prediction error) and its variance
+        v_t = z[t] - x_pred_t
+        S_t = P_pred_t + R[t]
+
+        # Accumulate log-likelihood
+        # log p(z_t | z_{1:t-1}) = -0.5 * (log(2π) + log(S_t) + v_t²/S_t)
+        log_lik -= 0.5 * (LOG_2PI + math.log(S_t) + v_t * v_t / S_t)
+
+        # Update; (1 - K) * P written as P - K * P keeps float32 arithmetic
+        K_t = P_pred_t / S_t  # Kalman gain
+        x_filt_prev = x_pred_t + K_t * v_t
+        P_filt_prev = P_pred_t - K_t * P_pred_t
+
+        x_pred[t] = x_pred_t
+        P_pred[t] = P_pred_t
+        x_filt[t] = x_filt_prev
+        P_filt[t] = P_filt_prev
+
+    return x_pred, P_pred, x_filt, P_filt, log_lik
+
+
+@njit(cache=True, fastmath=True)
+def _rts_backward_core(
+    x_filt: np.ndarray,
+    P_filt: np.ndarray,
+    x_pred: np.ndarray,
+    P_pred: np.ndarray,
+    C: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Rauch-Tung-Striebel backward recursion given precomputed gains C (compiled by numba)."""
+    T = x_filt.shape[0]
+    x_smooth = np.zeros_like(x_filt)
+    P_smooth = np.zeros_like(P_filt)
+
+    # Initialize at final time
+    x_smooth[T - 1] = x_filt[T - 1]
+    P_smooth[T - 1] = P_filt[T - 1]
+
+    # Backward recursion
+    for t in range(T - 2, -1, -1):
+        C_t = C[t]
+        x_smooth[t] = x_filt[t] + C_t * (x_smooth[t + 1] - x_pred[t + 1])
+        P_smooth[t] = P_filt[t] + C_t * C_t * (P_smooth[t + 1] - P_pred[t + 1])
+
+    return x_smooth, P_smooth
 
 
 def kalman_filter_1d(
@@ -62,51 +181,19 @@ def kalman_filter_1d(
     if T == 0:
         return np.array([]), np.array([]), np.array([]), np.array([]), 0.0
 
-    # Handle scalar or array obs_var
+    z = np.ascontiguousarray(z, dtype=np.float32)
+
+    # Handle scalar or array obs_var; a scalar becomes a zero-stride view
+    # rather than a freshly allocated length-T array
     if np.isscalar(obs_var):
-        R = np.full(T, obs_var)
+        R = np.broadcast_to(np.float32(obs_var), (T,))
     else:
-        R = np.asarray(obs_var)
-
-    # Model parameters
-    F = 1.0  # State transition
-    H = 1.0  # Observation matrix
-    Q = process_var
-
-    # Storage
-    x_pred = np.zeros(T)
-    P_pred = np.zeros(T)
-    x_filt = np.zeros(T)
-    P_filt = np.zeros(T)
-
-    # Log-likelihood accumulator
-    log_lik = 0.0
-
-    # Forward pass (Kalman filter)
-    for t in range(T):
-        if t == 0:
-            # Initialize with prior
-            x_pred[t] = x0_mean
-            P_pred[t] = x0_var
-        else:
-            # Predict
-            x_pred[t] = F * x_filt[t - 1]
-            P_pred[t] = F * P_filt[t - 1] * F + Q
-
-        # Innovation (prediction error)
-        v_t = z[t] - H * x_pred[t]
-        S_t = H * P_pred[t] * H + R[t]  # Innovation variance
-
-        # Accumulate log-likelihood
-        # log p(z_t | z_{1:t-1}) = -0.5 * (log(2π) + log(S_t) + v_t²/S_t)
-        log_lik += -0.5 * (np.log(2 * np.pi) + np.log(S_t) + v_t**2 / S_t)
-
-        # Update
-        K_t = P_pred[t] * H / S_t  # Kalman gain
-        x_filt[t] = x_pred[t] + K_t * v_t
-        P_filt[t] = (1 - K_t * H) * P_pred[t]
+        R = np.asarray(obs_var, dtype=np.float32)
 
-    return x_pred, P_pred, x_filt, P_filt, log_lik
+    x_pred, P_pred, x_filt, P_filt, log_lik = _kalman_forward_core(
+        z, R, np.float32(process_var), np.float32(x0_mean), np.float32(x0_var)
+    )
+    return x_pred, P_pred, x_filt, P_filt, float(log_lik)
 
 
 def kalman_smoother_1d(
@@ -128,31 +215,48 @@ def kalman_smoother_1d(
     Returns:
         Tuple of (x_smooth, P_smooth) arrays with smoothed states and variances.
     """
-    T = len(z)
-    if T == 0:
-        return np.array([]), np.array([])
+    if use_scan_smoother(len(z)):
+        return kalman_smoother_1d_scan(z, process_var, obs_var, x0_mean, x0_var)
 
-    # Run forward pass
-    x_pred, P_pred, x_filt, P_filt, _ = kalman_filter_1d(
+    x_smooth, P_smooth, _ = kalman_smoother_with_likelihood(
         z, process_var, obs_var, x0_mean, x0_var
     )
+    return x_smooth, P_smooth
 
-    # Backward pass (Rauch-Tung-Striebel smoother)
-    F = 1.0
-    x_smooth = np.zeros(T)
-    P_smooth = np.zeros(T)
-
-    # Initialize at final time
-    x_smooth[T - 1] = x_filt[T - 1]
-    P_smooth[T - 1] = P_filt[T - 1]
 
-    # Backward recursion
-    for t in range(T - 2, -1, -1):
-        C_t = P_filt[t] * F / P_pred[t + 1]
-        x_smooth[t] = x_filt[t] + C_t * (x_smooth[t + 1] - x_pred[t + 1])
-        P_smooth[t] = P_filt[t] + C_t**2 * (P_smooth[t + 1] - P_pred[t + 1])
+def kalman_smoother_short(
+    z: np.ndarray,
+    R_t: Union[float, np.ndarray],
+    process_var: float,
+    x0_var: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Closed-form Kalman smoother for one- or two-point series with x0_mean = z[0].
 
-    return x_smooth, P_smooth
+    Equivalent to kalman_smoother_1d but unrolled, skipping the array setup
+    that dominates for such short inputs.
+    """
+    R = np.broadcast_to(R_t, z.shape)
+
+    # First observation equals the prior mean, so only the variance updates
+    z0 = float(z[0])
+    P_f0 = x0_var * float(R[0]) / (x0_var + float(R[0]))
+    if len(z) == 1:
+        return np.array([z0], dtype=np.float32), np.array([P_f0], dtype=np.float32)
+
+    # Filter the second observation
+    P_p1 = P_f0 + process_var
+    K_1 = P_p1 / (P_p1 + float(R[1]))
+    x_f1 = z0 + K_1 * (float(z[1]) - z0)
+    P_f1 = (1.0 - K_1) * P_p1
+
+    # Smooth back to the first
+    C_0 = P_f0 / P_p1
+    x_s0 = z0 + C_0 * (x_f1 - z0)
+    P_s0 = P_f0 + C_0 * C_0 * (P_f1 - P_p1)
+    return (
+        np.array([x_s0, x_f1], dtype=np.float32),
+        np.array([P_s0, P_f1], dtype=np.float32),
+    )
 
 
 def kalman_smoother_with_likelihood(
@@ -184,16 +288,194 @@ def kalman_smoother_with_likelihood(
     )
 
     # Backward pass (Rauch-Tung-Striebel smoother)
-    F = 1.0
-    x_smooth = np.zeros(T)
-    P_smooth = np.zeros(T)
+    # Smoother gains C_t = P_filt[t] * F / P_pred[t+1] don't depend on the
+    # backward recursion, so compute them all at once (F = 1)
+    C = P_filt[:-1] / P_pred[1:]
+    x_smooth, P_smooth = _rts_backward_core(x_filt, P_filt, x_pred, P_pred, C)
 
-    x_smooth[T - 1] = x_filt[T - 1]
-    P_smooth[T - 1] = P_filt[T - 1]
+    return x_smooth, P_smooth, log_lik
 
-    for t in range(T - 2, -1, -1):
-        C_t = P_filt[t] * F / P_pred[t + 1]
-        x_smooth[t] = x_filt[t] + C_t * (x_smooth[t + 1] - x_pred[t + 1])
-        P_smooth[t] = P_filt[t] + C_t**2 * (P_smooth[t + 1] - P_pred[t + 1])
 
-    return x_smooth, P_smooth, log_lik
+def _inclusive_scan(elems: tuple[np.ndarray, ...], combine) -> tuple[np.ndarray, ...]:
+    """Hillis-Steele inclusive scan: log2(T) vectorized rounds of combine.
+
+    combine(earlier, later) must be associative and work elementwise on
+    tuples of equal-length arrays.
+    """
+    elems = tuple(e.copy() for e in elems)
+    T = len(elems[0])
+    offset = 1
+    while offset < T:
+        earlier = tuple(e[:-offset] for e in elems)
+        later = tuple(e[offset:] for e in elems)
+        combined = combine(earlier, later)
+        for e, c in zip(elems, combined):
+            e[offset:] = c
+        offset *= 2
+    return elems
+
+
+def _combine_filter(earlier, later):
+    """Associative operator on filtering elements (A, b, C, eta, J) with F = H = 1."""
+    A_i, b_i, C_i, eta_i, J_i = earlier
+    A_j, b_j, C_j, eta_j, J_j = later
+    D = 1.0 / (1.0 + C_i * J_j)
+    return (
+        A_j * D * A_i,
+        A_j * D * (b_i + C_i * eta_j) + b_j,
+        A_j * D * C_i * A_j + C_j,
+        A_i * D * (eta_j - J_j * b_i) + eta_i,
+        A_i * D * J_j * A_i + J_i,
+    )
+
+
+def _combine_smoother(earlier, later):
+    """Associative operator on smoothing elements (E, g, L), scanned from the end."""
+    E_j, g_j, L_j = earlier
+    E_i, g_i, L_i = later
+    return E_i * E_j, E_i * g_j + g_i, E_i * L_j * E_i + L_i
+
+
+def kalman_smoother_1d_scan(
+    z: np.ndarray,
+    process_var: float,
+    obs_var: Union[float, np.ndarray],
+    x0_mean: float,
+    x0_var: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Parallel-in-time Kalman filter and RTS smoother on 1D time series.
+
+    Same model and results as kalman_smoother_1d, but both passes are
+    written as prefix scans over associative elements (Särkkä and
+    García-Fernández, 2021), so the critical path is O(log T) vectorized
+    steps rather than T sequential ones.
+
+    Args:
+        z: Observations (log-transformed annualized rates).
+        process_var: Process variance Q for random walk.
+        obs_var: Observation variance R (scalar or array for time-varying).
+        x0_mean: Initial state mean.
+        x0_var: Initial state variance.
+
+    Returns:
+        Tuple of (x_smooth, P_smooth) arrays with smoothed states and variances.
+    """
+    T = len(z)
+    if T == 0:
+        return np.array([]), np.array([])
+
+    # Work in float64: the combined elements mix products of many gains
+    z = np.asarray(z, dtype=np.float64)
+    R = np.broadcast_to(np.asarray(obs_var, dtype=np.float64), (T,))
+    Q = float(process_var)
+
+    # Filtering elements; step t > 0 predicts with x_{t|t-1} = x_{t-1}, and
+    # the first step conditions the prior directly on z[0]
+    S = Q + R
+    K = Q / S
+    A = 1.0 - K
+    b = K * z
+    C = (1.0 - K) * Q
+    eta = z / S
+    J = 1.0 / S
+
+    S_0 = x0_var + R[0]
+    K_0 = x0_var / S_0
+    A[0] = 0.0
+    b[0] = x0_mean + K_0 * (z[0] - x0_mean)
+    C[0] = (1.0 - K_0) * x0_var
+    eta[0] = 0.0
+    J[0] = 0.0
+
+    _, x_filt, P_filt, _, _ = _inclusive_scan((A, b, C, eta, J), _combine_filter)
+
+    # Smoothing elements, scanned from the last step back to the first
+    E = P_filt / (P_filt + Q)
+    g = (1.0 - E) * x_filt
+    L = (1.0 - E) * P_filt
+    E[-1] = 0.0
+    g[-1] = x_filt[-1]
+    L[-1] = P_filt[-1]
+
+    _, x_smooth, P_smooth = _inclusive_scan(
+        (E[::-1], g[::-1], L[::-1]), _combine_smoother
+    )
+    return x_smooth[::-1].astype(np.float32), P_smooth[::-1].astype(np.float32)
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _batch_smoother_core(
+    Z: np.ndarray,
+    R: np.ndarray,
+    Q: float,
+    x0: np.ndarray,
+    x0_var: float,
+    lengths: np.ndarray,
+    out_x: np.ndarray,
+    out_P: np.ndarray,
+) -> None:
+    """Filter and smooth each row of Z in parallel, writing into out_x and out_P.
+
+    With F = H = 1 the one-step prediction from t is just (x_filt[t],
+    P_filt[t] + Q), so the backward pass can overwrite the filtered values
+    in place without storing the predictions.
+    """
+    for i in prange(Z.shape[0]):
+        T = lengths[i]
+        if T == 0:
+            continue
+
+        # Forward pass (Kalman filter), storing filtered estimates
+        x = x0[i]
+        P = x0_var
+        for t in range(T):
+            if t > 0:
+                P = P + Q
+            S_t = P + R[i, t]
+            K_t = P / S_t
+            x = x + K_t * (Z[i, t] - x)
+            P = P - K_t * P
+            out_x[i, t] = x
+            out_P[i, t] = P
+
+        # Backward pass (Rauch-Tung-Striebel smoother), in place
+        for t in range(T - 2, -1, -1):
+            P_pred_next = out_P[i, t] + Q
+            C_t = out_P[i, t] / P_pred_next
+            out_x[i, t] = out_x[i, t] + C_t * (out_x[i, t + 1] - out_x[i, t])
+            out_P[i, t] = out_P[i, t] + C_t * C_t * (out_P[i, t + 1] - P_pred_next)
+
+
+def kalman_smoother_batch(
+    Z: np.ndarray,
+    process_var: float,
+    R: np.ndarray,
+    x0_mean: np.ndarray,
+    lengths: np.ndarray,
+    x0_var: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run Kalman filter and RTS smoother on many padded 1D series at once.
+
+    Args:
+        Z: Observations, shape (n_series, T_max); row i is valid up to lengths[i].
+        process_var: Process variance Q for random walk (shared by all series).
+        R: Observation variances, same shape as Z.
+        x0_mean: Initial state mean for each series.
+        lengths: Number of valid time points in each row.
+        x0_var: Initial state variance.
+
+    Returns:
+        Tuple of (x_smooth, P_smooth) arrays shaped like Z. Entries past each
+        row's length are left at zero.
+    """
+    Z = np.ascontiguousarray(Z, dtype=np.float32)
+    R = np.ascontiguousarray(R, dtype=np.float32)
+    x0_mean = np.ascontiguousarray(x0_mean, dtype=np.float32)
+    lengths = np.ascontiguousarray(lengths, dtype=np.int64)
+
+    x_smooth = np.zeros_like(Z)
+    P_smooth = np.zeros_like(Z)
+    _batch_smoother_core(
+        Z, R, np.float32(process_var), x0_mean, np.float32(x0_var), lengths, x_smooth, P_smooth
+    )
+    return x_smooth, P_smooth
@@ -7,46 +7,183 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
-import math
-from datetime import datetime, timezone
-from typing import Any, Optional
+import functools
+import itertools
+import multiprocessing
+import os
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import IO, Any, Iterable, Iterator, Optional, Union
 
 import numpy as np
+import orjson
 
-from .kalman import compute_obs_variance, kalman_smoother_1d
+from ._io import load_citations
+from ._jit import set_num_threads
+from ._series import years_counts
+from ._time import compute_exposure_fraction, paper_scraped_at, parse_scraped_at
+from .kalman import (
+    kalman_smoother_1d,
+    kalman_smoother_1d_scan,
+    kalman_smoother_batch,
+    kalman_smoother_short,
+    obs_variance_from_shifted,
+    use_scan_smoother,
+)
 
+# Papers are smoothed in batches of this size as they stream through
+BATCH_SIZE = 1024
 
-def parse_scraped_at(scraped_at_str: str) -> datetime:
-    """Parse scraped_at timestamp to timezone-aware datetime."""
-    # Handle ISO format with timezone
-    if scraped_at_str.endswith("Z"):
-        scraped_at_str = scraped_at_str[:-1] + "+00:00"
-    return datetime.fromisoformat(scraped_at_str)
+# Smaller batches when papers are spread over worker processes
+WORKER_BATCH_SIZE = 64
 
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+NDJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
 
-def compute_exposure_fraction(scraped_at: datetime) -> float:
-    """Compute fraction of current year that has been observed.
+# Random source for forecast sampling
+_RNG = np.random.default_rng()
+
+
+@dataclass
+class PaperSeries:
+    """Observation series for one paper, ready for smoothing."""
+
+    years: np.ndarray
+    counts: np.ndarray
+    exposure: np.ndarray
+    empirical: np.ndarray
+    z: np.ndarray
+    R_t: Union[float, np.ndarray]
+
+
+def prepare_series(
+    paper: dict[str, Any],
+    scraped_at: datetime,
+    min_count: float,
+    obs_var: Optional[float] = None,
+    obs_overdispersion: Optional[float] = None,
+    exposure_frac: Optional[float] = None,
+) -> Optional[PaperSeries]:
+    """Build the log-rate observations and their variances for a paper.
+
+    The paper's own fetched_at, when present, takes the place of
+    scraped_at and exposure_frac.
+
+    Args:
+        paper: Paper dict with title and citations_by_year.
+        scraped_at: When the data was scraped.
+        min_count: Pseudocount to add before log transform.
+        obs_var: Constant observation variance (if not using overdispersion).
+        obs_overdispersion: Overdispersion factor φ for time-varying variance.
+        exposure_frac: compute_exposure_fraction(scraped_at), if already known.
 
     Returns:
-        Fraction between 0 and 1 representing how much of the year has passed.
+        PaperSeries, or None if the paper has no citations.
     """
+    citations = paper.get("citations_by_year", {})
+    if not citations:
+        return None
+
+    # Build year grid and counts from available data
+    years, counts = years_counts(citations)
+    scraped_at, exposure_frac = paper_scraped_at(paper, scraped_at, exposure_frac)
     current_year = scraped_at.year
-    tz = scraped_at.tzinfo or timezone.utc
 
-    year_start = datetime(current_year, 1, 1, tzinfo=tz)
-    next_year_start = datetime(current_year + 1, 1, 1, tzinfo=tz)
+    # Build exposure array and empirical rates (annualized); only a partial
+    # current year needs scaling
+    exposure = np.ones_like(counts)
+    empirical = counts
+    if years[-1] == current_year:
+        if exposure_frac is None:
+            exposure_frac = compute_exposure_fraction(scraped_at)
+        exposure[-1] = exposure_frac
+        empirical = counts.copy()
+        empirical[-1] /= max(exposure_frac, 1e-6)
+
+    # Transform to log space with pseudocount
+    shifted = empirical + min_count
+    z = np.log(shifted)
+
+    # Determine observation variance
+    if obs_overdispersion is not None:
+        # Time-varying variance based on Poisson approximation
+        R_t = obs_variance_from_shifted(shifted, obs_overdispersion)
+    else:
+        # Constant variance
+        R_t = obs_var if obs_var is not None else 0.3
+
+    return PaperSeries(years, counts, exposure, empirical, z, R_t)
 
-    total_seconds = (next_year_start - year_start).total_seconds()
-    elapsed_seconds = (scraped_at - year_start).total_seconds()
 
-    fraction = elapsed_seconds / total_seconds
+def smooth_series_batch(
+    series_list: list[Optional[PaperSeries]],
+    process_var: float,
+) -> list[Optional[tuple[np.ndarray, np.ndarray]]]:
+    """Run the Kalman smoother over many papers in one batched call.
 
-    # Sanity check
-    if not (0.0 < fraction <= 1.0):
-        return 1.0
+    Args:
+        series_list: Prepared series (None for papers without citations).
+        process_var: Process variance for Kalman filter.
 
-    return fraction
+    Returns:
+        List of (x_smooth, P_smooth) aligned with series_list (None where the
+        input was None).
+    """
+    # Single-year papers have a closed-form result and, without numba, long
+    # papers go to the scan smoother; neither is packed for the kernel
+    valid = [s for s in series_list if s is not None and _uses_batch_kernel(s)]
+    if not valid:
+        return [
+            None if s is None else _smooth_unbatched(s, process_var)
+            for s in series_list
+        ]
+
+    n = len(valid)
+    lengths = np.array([len(s.z) for s in valid], dtype=np.int64)
+    T_max = int(lengths.max())
+
+    # Pack into padded float32 arrays; padding is never read by the kernel
+    Z = np.zeros((n, T_max), dtype=np.float32)
+    R = np.ones((n, T_max), dtype=np.float32)
+    x0 = np.empty(n, dtype=np.float32)
+    for i, s in enumerate(valid):
+        T = lengths[i]
+        Z[i, :T] = s.z
+        R[i, :T] = s.R_t
+        x0[i] = s.z[0]
+
+    x_smooth, P_smooth = kalman_smoother_batch(Z, process_var, R, x0, lengths, x0_var=1.0)
+
+    results = []
+    row = 0
+    for s in series_list:
+        if s is None:
+            results.append(None)
+            continue
+        if not _uses_batch_kernel(s):
+            results.append(_smooth_unbatched(s, process_var))
+            continue
+        T = lengths[row]
+        results.append((x_smooth[row, :T], P_smooth[row, :T]))
+        row += 1
+    return results
+
+
+def _uses_batch_kernel(series: PaperSeries) -> bool:
+    """Whether smooth_series_batch packs this series for the batched kernel."""
+    T = len(series.z)
+    return T > 1 and not use_scan_smoother(T)
+
+
+def _smooth_unbatched(series: PaperSeries, process_var: float) -> tuple[np.ndarray, np.ndarray]:
+    """Smooth a series that smooth_series_batch leaves out of the kernel."""
+    if len(series.z) == 1:
+        return kalman_smoother_short(series.z, series.R_t, process_var, x0_var=1.0)
+    return kalman_smoother_1d_scan(
+        series.z, process_var, series.R_t, x0_mean=series.z[0], x0_var=1.0
+    )
 
 
 def analyze_paper(
@@ -57,6 +194,10 @@ def analyze_paper(
     obs_var: Optional[float] = None,
     obs_overdispersion: Optional[float] = None,
     forecast_years: int = 0,
+    series: Optional[PaperSeries] = None,
+    smoothed: Optional[tuple[np.ndarray, np.ndarray]] = None,
+    exposure_frac: Optional[float] = None,
+    rng: Optional[np.random.Generator] = None,
 ) -> dict[str, Any]:
     """Analyze a single paper's citation time series.
 
@@ -68,14 +209,21 @@ def analyze_paper(
         obs_var: Constant observation variance (if not using overdispersion).
         obs_overdispersion: Overdispersion factor φ for time-varying variance.
         forecast_years: Number of years to forecast into the future.
+        series: Precomputed output of prepare_series for this paper.
+        smoothed: Precomputed (x_smooth, P_smooth), e.g. from smooth_series_batch.
+        exposure_frac: compute_exposure_fraction(scraped_at), if already known.
+        rng: Generator for forecast samples (default: the module-level one).
 
     Returns:
         Dict with years, observed counts, empirical rates, smoothed rates, and forecasts.
     """
-    citations = paper.get("citations_by_year", {})
+    if series is None:
+        series = prepare_series(
+            paper, scraped_at, min_count, obs_var, obs_overdispersion, exposure_frac
+        )
 
     # Handle empty citations
-    if not citations:
+    if series is None:
         return {
             "title": paper["title"],
             "years": [],
@@ -87,104 +235,84 @@ def analyze_paper(
             "smoothed_rate_std": [],
         }
 
-    # Build year grid from available data
-    years = sorted(int(y) for y in citations.keys())
-    current_year = scraped_at.year
-
-    # Get counts for each year (0 if missing within range)
-    counts = np.array([citations.get(str(y), 0) for y in years], dtype=float)
-
-    # Build exposure array
-    exposure = np.ones_like(counts)
-    if years[-1] == current_year:
-        exposure[-1] = compute_exposure_fraction(scraped_at)
+    years = series.years
+    counts = series.counts
+    exposure = series.exposure
+    empirical = series.empirical
 
-    # Empirical rates (annualized)
-    empirical = counts / np.maximum(exposure, 1e-6)
-
-    # Transform to log space with pseudocount
-    z = np.log(empirical + min_count)
-
-    # Determine observation variance
-    if obs_overdispersion is not None:
-        # Time-varying variance based on Poisson approximation
-        R_t = compute_obs_variance(empirical, obs_overdispersion, min_count)
+    # Run Kalman smoother
+    if smoothed is not None:
+        x_smooth, P_smooth = smoothed
+    elif len(series.z) <= 2:
+        x_smooth, P_smooth = kalman_smoother_short(series.z, series.R_t, process_var, x0_var=1.0)
     else:
-        # Constant variance
-        R_t = obs_var if obs_var is not None else 0.3
+        x_smooth, P_smooth = kalman_smoother_1d(
+            series.z,
+            process_var=process_var,
+            obs_var=series.R_t,
+            x0_mean=series.z[0],
+            x0_var=1.0,
+        )
 
-    # Run Kalman smoother
-    x_smooth, P_smooth = kalman_smoother_1d(
-        z,
-        process_var=process_var,
-        obs_var=R_t,
-        x0_mean=z[0],
-        x0_var=1.0,
-    )
+    # Keep smoothed outputs in float32 whatever the smoother handed back;
+    # this halves what orjson has to format
+    x_smooth = np.asarray(x_smooth, dtype=np.float32)
+    P_smooth = np.asarray(P_smooth, dtype=np.float32)
 
     # Back-transform to rate space
     smoothed_rate = np.exp(x_smooth)
-    smoothed_std = smoothed_rate * np.sqrt(P_smooth)
+    smoothed_std = (smoothed_rate * np.sqrt(P_smooth)).astype(np.float32, copy=False)
 
     result = {
         "title": paper["title"],
         "years": years,
-        "observed_citations": counts.tolist(),
-        "exposure_fraction": exposure.tolist(),
-        "empirical_rate": empirical.tolist(),
-        "smoothed_rate": smoothed_rate.tolist(),
-        "smoothed_log_rate": x_smooth.tolist(),
-        "smoothed_rate_std": smoothed_std.tolist(),
+        "observed_citations": counts,
+        "exposure_fraction": exposure,
+        "empirical_rate": empirical,
+        "smoothed_rate": smoothed_rate,
+        "smoothed_log_rate": x_smooth,
+        "smoothed_rate_std": smoothed_std,
     }
 
     # Add forecasts if requested
     if forecast_years > 0:
-        last_year = years[-1]
+        last_year = int(years[-1])
         forecast_years_list = [last_year + h for h in range(1, forecast_years + 1)]
 
         # Get final smoothed state
-        x_T = x_smooth[-1]
-        P_T = P_smooth[-1]
-
-        # Compute forecasts for each horizon
-        f_log_var = []
-        f_rate_median = []
-        f_rate_std = []
-        f_sampled_log_rate = []
-        f_sampled_rate = []
+        x_T = float(x_smooth[-1])
+        P_T = float(P_smooth[-1])
 
         # For observation noise sampling
         sigma_min = 0.1
         phi = obs_overdispersion if obs_overdispersion is not None else 0.56
 
-        for h in range(1, forecast_years + 1):
-            # Forecast variance grows linearly with horizon
-            var_h = P_T + h * process_var
-            mean_h = x_T  # Mean stays constant (random walk has no drift)
-
-            f_log_var.append(float(var_h))
+        # Compute forecasts for all horizons at once
+        h = np.arange(1, forecast_years + 1)
 
-            # Transform to rate space (lognormal distribution)
-            median_lambda = math.exp(mean_h)
-            var_lambda = (math.exp(var_h) - 1.0) * math.exp(2 * mean_h + var_h)
-            std_lambda = math.sqrt(var_lambda)
+        # Forecast variance grows linearly with horizon; the mean stays at
+        # x_T (random walk has no drift)
+        f_log_var = P_T + h * process_var
 
-            f_rate_median.append(median_lambda)
-            f_rate_std.append(std_lambda)
+        # Transform to rate space (lognormal distribution)
+        median_lambda = np.exp(x_T)
+        f_rate_median = np.full(forecast_years, median_lambda)
+        # exp(2*x_T + v) = median^2 * exp(v), so one exp per horizon suffices
+        e_var = np.exp(f_log_var)
+        var_lambda = (e_var - 1.0) * e_var * median_lambda**2
+        f_rate_std = np.sqrt(var_lambda)
 
-            # Sample state (log-rate) from forecast distribution
-            log_rate_sample = np.random.normal(mean_h, math.sqrt(var_h))
+        # Sample state (log-rate) from forecast distribution
+        if rng is None:
+            rng = _RNG
+        log_rate_sample = rng.normal(x_T, np.sqrt(f_log_var))
 
-            # Compute observation variance (same formula as compute_obs_variance)
-            rate_sample = math.exp(log_rate_sample)
-            R_h = phi / (rate_sample + min_count) + sigma_min**2
+        # Compute observation variance (same formula as compute_obs_variance)
+        R_h = phi / (np.exp(log_rate_sample) + min_count) + sigma_min**2
 
-            # Sample observed log-rate with observation noise
-            sampled_log_rate = np.random.normal(log_rate_sample, math.sqrt(R_h))
-            sampled_rate = math.exp(sampled_log_rate)
-
-            f_sampled_log_rate.append(float(sampled_log_rate))
-            f_sampled_rate.append(float(sampled_rate))
+        # Sample observed log-rate with observation noise
+        f_sampled_log_rate = rng.normal(log_rate_sample, np.sqrt(R_h))
+        f_sampled_rate = np.exp(f_sampled_log_rate)
 
         result.update({
             "forecast_years": forecast_years_list,
@@ -200,7 +328,7 @@ def analyze_paper(
 
 def check_citation_totals(paper: dict[str, Any], analyzed: dict[str, Any]) -> None:
     """Warn if observed citations don't match total_citations."""
-    total_from_years = sum(analyzed["observed_citations"])
+    total_from_years = float(np.asarray(analyzed["observed_citations"]).sum())
     expected_total = paper.get("total_citations", 0)
 
     if abs(total_from_years - expected_total) > 0.5:
@@ -210,6 +338,172 @@ def check_citation_totals(paper: dict[str, Any], analyzed: dict[str, Any]) -> No
         )
 
 
+def _batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Yield successive lists of up to size items."""
+    it = iter(items)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+def analyze_batch(
+    batch: list[dict[str, Any]],
+    scraped_at: datetime,
+    process_var: float,
+    min_count: float,
+    obs_var: Optional[float] = None,
+    obs_overdispersion: Optional[float] = None,
+    forecast_years: int = 0,
+    exposure_frac: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Analyze a batch of papers, smoothing them all in one kernel call.
+
+    Arguments match analyze_paper, plus:
+        seed: If given, each paper's forecasts are drawn from a generator
+            seeded by this and its title, so samples are reproducible.
+
+    Returns analyzed paper dicts in input order.
+    """
+    if exposure_frac is None:
+        exposure_frac = compute_exposure_fraction(scraped_at)
+
+    series_list = [
+        prepare_series(paper, scraped_at, min_count, obs_var, obs_overdispersion, exposure_frac)
+        for paper in batch
+    ]
+    smoothed_list = smooth_series_batch(series_list, process_var)
+
+    results = []
+    for paper, series, smoothed in zip(batch, series_list, smoothed_list):
+        analyzed = analyze_paper(
+            paper,
+            scraped_at,
+            process_var=process_var,
+            min_count=min_count,
+            obs_var=obs_var,
+            obs_overdispersion=obs_overdispersion,
+            forecast_years=forecast_years,
+            series=series,
+            smoothed=smoothed,
+            rng=paper_rng(paper, seed) if seed is not None else None,
+        )
+        check_citation_totals(paper, analyzed)
+        results.append(analyzed)
+    return results
+
+
+def paper_rng(paper: dict[str, Any], seed: int) -> np.random.Generator:
+    """Return a forecast generator that depends only on seed (>= 0) and paper title."""
+    # crc32 rather than hash(), which is salted per process
+    title_key = zlib.crc32(paper["title"].encode("utf-8"))
+    return np.random.default_rng([seed, title_key])
+
+
+def _init_worker() -> None:
+    """Set up a worker process for analyze_papers."""
+    global _RNG
+    # Forked workers inherit the parent's generator state; reseed so they
+    # don't all draw the same forecast samples
+    _RNG = np.random.default_rng()
+    # Parallelism comes from the processes, so don't also start numba threads
+    set_num_threads(1)
+
+
+def analyze_papers(
+    papers: Iterable[dict[str, Any]],
+    scraped_at: datetime,
+    process_var: float,
+    min_count: float,
+    obs_var: Optional[float] = None,
+    obs_overdispersion: Optional[float] = None,
+    forecast_years: int = 0,
+    workers: int = 1,
+    exposure_frac: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Iterator[dict[str, Any]]:
+    """Analyze papers as they arrive, in batches, optionally across processes.
+
+    Arguments match analyze_batch, plus:
+        workers: Number of worker processes (1 analyzes in this process).
+
+    Yields analyzed paper dicts in input order. At most a few batches per
+    worker are in flight, so streamed input is never read far ahead.
+    """
+    analyze = functools.partial(
+        analyze_batch,
+        scraped_at=scraped_at,
+        process_var=process_var,
+        min_count=min_count,
+        obs_var=obs_var,
+        obs_overdispersion=obs_overdispersion,
+        forecast_years=forecast_years,
+        exposure_frac=exposure_frac,
+        seed=seed,
+    )
+
+    if workers <= 1:
+        for batch in _batched(papers, BATCH_SIZE):
+            yield from analyze(batch)
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for batch in _batched(papers, WORKER_BATCH_SIZE):
+            pending.append(pool.apply_async(analyze, (batch,)))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def write_json_stream(f: IO[bytes], header: dict[str, Any], papers: Iterable[dict[str, Any]]) -> int:
+    """Write header fields followed by a "papers" list, one paper at a time.
+
+    The bytes match orjson.dumps({**header, "papers": [...]}, option=JSON_OPTIONS)
+    without holding every paper in memory.
+
+    Args:
+        f: Output file opened in binary mode.
+        header: Non-empty dict of top-level fields to write before papers.
+        papers: Paper dicts to write.
+
+    Returns:
+        Number of papers written.
+    """
+    # Reopen the header object by dropping its closing "\n}"
+    f.write(orjson.dumps(header, option=JSON_OPTIONS)[:-2])
+    f.write(b',\n  "papers": [')
+
+    n = 0
+    for paper in papers:
+        f.write(b"\n    " if n == 0 else b",\n    ")
+        f.write(orjson.dumps(paper, option=JSON_OPTIONS).replace(b"\n", b"\n    "))
+        n += 1
+
+    f.write(b"\n  ]\n}" if n else b"]\n}")
+    return n
+
+
+def write_ndjson_stream(f: IO[bytes], header: dict[str, Any], papers: Iterable[dict[str, Any]]) -> int:
+    """Write newline-delimited JSON: the header on the first line, then one paper per line.
+
+    Args:
+        f: Output file opened in binary mode.
+        header: Dict of top-level fields for the first line.
+        papers: Paper dicts to write.
+
+    Returns:
+        Number of papers written.
+    """
+    f.write(orjson.dumps(header, option=NDJSON_OPTIONS))
+
+    n = 0
+    for paper in papers:
+        f.write(orjson.dumps(paper, option=NDJSON_OPTIONS))
+        n += 1
+    return n
+
+
 def main() -> None:
     """Run citation rate analysis."""
     parser = argparse.ArgumentParser(
@@ -263,43 +557,39 @@ def main() -> None:
         default=5,
         help="Number of years to forecast into the future (default: 5)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for analyzing papers; 0 uses every CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Non-negative seed for reproducible forecast samples (default: unseeded)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="json writes one document; ndjson writes a header line, then one line per paper (default: json)",
+    )
 
     args = parser.parse_args()
 
+    # default_rng only accepts non-negative seeds; check before any work
+    if args.seed is not None and args.seed < 0:
+        parser.error("--seed must be non-negative")
+
+    # A negative count would otherwise silently run serially
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+
     # If obs-var is explicitly set, disable overdispersion
     if args.obs_var is not None:
         args.obs_overdispersion = None
 
-    # Load input
-    print(f"Loading {args.input}...")
-    with open(args.input) as f:
-        data = json.load(f)
-
-    # Parse scraped_at
-    scraped_at = parse_scraped_at(data["scraped_at"])
-    print(f"Data scraped at: {scraped_at}")
-    print(f"Exposure fraction for {scraped_at.year}: {compute_exposure_fraction(scraped_at):.3f}")
-
-    # Analyze each paper
-    papers = data.get("papers", [])
-    print(f"Analyzing {len(papers)} papers...")
-    if args.forecast_years > 0:
-        print(f"Forecasting {args.forecast_years} years into the future...")
-
-    analyzed_papers = []
-    for paper in papers:
-        analyzed = analyze_paper(
-            paper,
-            scraped_at,
-            process_var=args.process_var,
-            min_count=args.min_count,
-            obs_var=args.obs_var,
-            obs_overdispersion=args.obs_overdispersion,
-            forecast_years=args.forecast_years,
-        )
-        check_citation_totals(paper, analyzed)
-        analyzed_papers.append(analyzed)
-
     # Build model metadata
     model_info = {
         "type": args.model,
@@ -311,31 +601,72 @@ def main() -> None:
     else:
         model_info["obs_var"] = args.obs_var
 
-    # Build output
-    result = {
-        "user_id": data.get("user_id"),
-        "scraped_at": data.get("scraped_at"),
-        "model": model_info,
-        "papers": analyzed_papers,
-    }
+    # Load input
+    print(f"Loading {args.input}...")
+    with open(args.input, "rb") as f_in:
+        data, papers = load_citations(f_in)
+
+        # Parse scraped_at
+        scraped_at = parse_scraped_at(data["scraped_at"])
+        exposure_frac = compute_exposure_fraction(scraped_at)
+        print(f"Data scraped at: {scraped_at}")
+        print(f"Exposure fraction for {scraped_at.year}: {exposure_frac:.3f}")
+
+        # Build output header; papers are streamed in after it
+        result = {
+            "user_id": data.get("user_id"),
+            "scraped_at": data.get("scraped_at"),
+            "model": model_info,
+        }
 
-    # Add forecast metadata if forecasting was requested
-    if args.forecast_years > 0:
-        result["forecast"] = {
-            "horizon_years": args.forecast_years,
-            "assumptions": {
-                "model": "random_walk_log_rate",
-                "process_var": args.process_var,
-                "obs_overdispersion": args.obs_overdispersion,
-                "min_count": args.min_count,
+        # Add forecast metadata if forecasting was requested
+        if args.forecast_years > 0:
+            result["forecast"] = {
+                "horizon_years": args.forecast_years,
+                "assumptions": {
+                    "model": "random_walk_log_rate",
+                    "process_var": args.process_var,
+                    "obs_overdispersion": args.obs_overdispersion,
+                    "min_count": args.min_count,
+                }
             }
-        }
 
-    # Write output
-    print(f"Writing {args.output}...")
-    with open(args.output, "w") as f:
-        json.dump(result, f, indent=2)
+        # Analyze each paper
+        print("Analyzing papers...")
+        if args.forecast_years > 0:
+            print(f"Forecasting {args.forecast_years} years into the future...")
+
+        analyzed_papers = analyze_papers(
+            papers,
+            scraped_at,
+            process_var=args.process_var,
+            min_count=args.min_count,
+            obs_var=args.obs_var,
+            obs_overdispersion=args.obs_overdispersion,
+            forecast_years=args.forecast_years,
+            workers=args.workers or os.cpu_count() or 1,
+            exposure_frac=exposure_frac,
+            seed=args.seed,
+        )
 
+        # Write output as papers are analyzed, into a temporary file that
+        # replaces the output only once every paper is written, so a failed
+        # run leaves any previous output intact
+        print(f"Writing {args.output}...")
+        tmp_output = f"{args.output}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_output, "wb") as f_out:
+                if args.output_format == "ndjson":
+                    n_papers = write_ndjson_stream(f_out, result, analyzed_papers)
+                else:
+                    n_papers = write_json_stream(f_out, result, analyzed_papers)
+        except BaseException:
+            if os.path.exists(tmp_output):
+                os.remove(tmp_output)
+            raise
+        os.replace(tmp_output, args.output)
+
+    print(f"Analyzed {n_papers} papers")
     print("Done!")
 
 
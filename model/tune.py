@@ -10,46 +10,39 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
-from datetime import datetime, timezone
-from typing import Any
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
 
 import numpy as np
+import orjson
 
-from .kalman import compute_obs_variance, kalman_filter_1d
+try:
+    import jax
+    import jax.numpy as jnp
+    HAS_JAX = True
+except ImportError:
+    HAS_JAX = False
 
-
-def parse_scraped_at(scraped_at_str: str) -> datetime:
-    """Parse scraped_at timestamp to timezone-aware datetime."""
-    if scraped_at_str.endswith("Z"):
-        scraped_at_str = scraped_at_str[:-1] + "+00:00"
-    return datetime.fromisoformat(scraped_at_str)
-
-
-def compute_exposure_fraction(scraped_at: datetime) -> float:
-    """Compute fraction of current year observed."""
-    current_year = scraped_at.year
-    tz = scraped_at.tzinfo or timezone.utc
-
-    year_start = datetime(current_year, 1, 1, tzinfo=tz)
-    next_year_start = datetime(current_year + 1, 1, 1, tzinfo=tz)
-
-    total_seconds = (next_year_start - year_start).total_seconds()
-    elapsed_seconds = (scraped_at - year_start).total_seconds()
-
-    fraction = elapsed_seconds / total_seconds
-    if not (0.0 < fraction <= 1.0):
-        return 1.0
-    return fraction
+from ._io import load_citations
+from ._jit import HAS_NUMBA, njit, prange
+from ._series import years_counts
+from ._time import compute_exposure_fraction, paper_scraped_at, parse_scraped_at
+from .kalman import LOG_2PI, compute_obs_variance
 
 
 def prepare_paper_data(
     paper: dict[str, Any],
     scraped_at: datetime,
     min_count: float,
+    exposure_frac: Optional[float] = None,
 ) -> tuple[np.ndarray, np.ndarray] | None:
     """Prepare observation and empirical rate arrays for a paper.
 
+    exposure_frac is compute_exposure_fraction(scraped_at), if already known.
+    The paper's own fetched_at, when present, takes the place of both.
+
     Returns:
         Tuple of (z, empirical_rate) or None if paper has no citations.
     """
@@ -57,17 +50,17 @@ def prepare_paper_data(
     if not citations:
         return None
 
-    years = sorted(int(y) for y in citations.keys())
+    years, counts = years_counts(citations)
+    scraped_at, exposure_frac = paper_scraped_at(paper, scraped_at, exposure_frac)
     current_year = scraped_at.year
 
-    counts = np.array([citations.get(str(y), 0) for y in years], dtype=float)
-
-    exposure = np.ones_like(counts)
+    # Empirical rates (annualized); only a partial current year needs scaling
+    empirical = counts
     if years[-1] == current_year:
-        exposure[-1] = compute_exposure_fraction(scraped_at)
-
-    # Empirical rates (annualized)
-    empirical = counts / np.maximum(exposure, 1e-6)
+        if exposure_frac is None:
+            exposure_frac = compute_exposure_fraction(scraped_at)
+        empirical = counts.copy()
+        empirical[-1] /= max(exposure_frac, 1e-6)
 
     # Transform to log space
     z = np.log(empirical + min_count)
@@ -75,93 +68,332 @@ def prepare_paper_data(
     return z, empirical
 
 
-def compute_total_log_likelihood(
+@dataclass
+class PackedPapers:
+    """Per-paper series packed into padded arrays for batched filtering.
+
+    Z and E are float32 log-rates and empirical rates of shape
+    (n_papers, T_max), padded with zeros; valid marks the real entries.
+    Padding is zero rather than NaN so that masked-out terms stay finite.
+    """
+
+    Z: np.ndarray
+    E: np.ndarray
+    valid: np.ndarray
+
+    def __len__(self) -> int:
+        return self.Z.shape[0]
+
+
+def pack_paper_data(
     papers_data: list[tuple[np.ndarray, np.ndarray]],
+) -> PackedPapers:
+    """Pack per-paper series into padded arrays for batched filtering.
+
+    Papers with fewer than 2 years are left out, since they don't inform
+    the hyperparameters.
+
+    Args:
+        papers_data: List of (z, empirical_rate) tuples for each paper.
+
+    Returns:
+        PackedPapers holding every paper with at least 2 years.
+    """
+    series = [(z, e) for z, e in papers_data if len(z) >= 2]
+    n = len(series)
+    T_max = max((len(z) for z, _ in series), default=0)
+
+    Z = np.zeros((n, T_max), dtype=np.float32)
+    E = np.zeros((n, T_max), dtype=np.float32)
+    valid = np.zeros((n, T_max), dtype=bool)
+    for i, (z, e) in enumerate(series):
+        T = len(z)
+        Z[i, :T] = z
+        E[i, :T] = e
+        valid[i, :T] = True
+
+    return PackedPapers(Z, E, valid)
+
+
+@njit(cache=True, fastmath=True)
+def _total_log_lik_core(
+    Z: np.ndarray,
+    R: np.ndarray,
+    valid: np.ndarray,
+    q: float,
+) -> float:
+    """Scalar Kalman filter log-likelihood summed over packed papers (compiled by numba)."""
+    total = 0.0
+    for i in range(Z.shape[0]):
+        # Prior: x0_mean = first observation, x0_var = 1
+        x = Z[i, 0]
+        P = np.float32(1.0)
+        for t in range(Z.shape[1]):
+            if not valid[i, t]:
+                break
+            if t > 0:
+                P = P + q
+
+            y = Z[i, t] - x
+            S = P + R[i, t]
+            total -= 0.5 * (LOG_2PI + math.log(S) + y * y / S)
+
+            K = P / S
+            x = x + K * y
+            P = P - K * P
+    return total
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _q_sweep_core(
+    Z: np.ndarray,
+    R: np.ndarray,
+    valid: np.ndarray,
+    q_grid: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """Fill out[i] with the total log-likelihood at q_grid[i] for fixed R, in parallel."""
+    for i in prange(q_grid.shape[0]):
+        out[i] = _total_log_lik_core(Z, R, valid, q_grid[i])
+
+
+def compute_total_log_likelihood(
+    packed: PackedPapers,
     process_var: float,
     overdispersion: float,
     min_count: float,
     sigma_min_sq: float = 0.01,
+    R: Optional[np.ndarray] = None,
 ) -> float:
     """Compute total log-likelihood across all papers for given hyperparameters.
 
+    With numba installed this runs a compiled scalar filter over every paper.
+    Otherwise it runs the filter on all papers in lockstep with NumPy, with
+    the state mean and variance held as vectors over papers; padded entries
+    are filtered like any other but left out of the likelihood.
+
     Args:
-        papers_data: List of (z, empirical_rate) tuples for each paper.
+        packed: Papers from pack_paper_data.
         process_var: Process variance q.
         overdispersion: Overdispersion factor φ.
         min_count: Pseudocount for log transform.
         sigma_min_sq: Floor variance.
+        R: Precomputed compute_obs_variance(E, overdispersion, min_count,
+            sigma_min_sq), to reuse across process_var values.
 
     Returns:
         Sum of log-likelihoods across all papers.
     """
-    total_log_lik = 0.0
-
-    for z, empirical in papers_data:
-        if len(z) < 2:
-            # Skip papers with fewer than 2 years
-            continue
-
-        # Compute time-varying observation variance
-        R_t = compute_obs_variance(empirical, overdispersion, min_count, sigma_min_sq)
-
-        # Run Kalman filter to get log-likelihood
-        _, _, _, _, log_lik = kalman_filter_1d(
-            z,
-            process_var=process_var,
-            obs_var=R_t,
-            x0_mean=z[0],
-            x0_var=1.0,
-        )
+    Z, E, valid = packed.Z, packed.E, packed.valid
+    n, T_max = Z.shape
+    if n == 0:
+        return 0.0
+
+    # Time-varying observation variance for every paper and year
+    if R is None:
+        R = compute_obs_variance(E, overdispersion, min_count, sigma_min_sq)
+    R = R.astype(np.float32, copy=False)
+    q = np.float32(process_var)
+
+    if HAS_NUMBA:
+        return float(_total_log_lik_core(Z, R, valid, q))
+
+    # Prior: x0_mean = first observation, x0_var = 1
+    x = Z[:, 0].copy()
+    P = np.ones(n, dtype=np.float32)
+    log_lik = np.zeros(n)
+
+    for t in range(T_max):
+        # Predict
+        P_pred = P + q if t > 0 else P
+
+        # Innovation and log-likelihood
+        y = Z[:, t] - x
+        S = P_pred + R[:, t]
+        log_lik -= 0.5 * valid[:, t] * (LOG_2PI + np.log(S) + y * y / S)
+
+        # Update
+        K = P_pred / S
+        x = x + K * y
+        P = P_pred - K * P_pred
+
+    return float(log_lik.sum())
+
+
+if HAS_JAX:
+
+    @jax.jit
+    def _jax_grid_core(Z_t, E_t, valid_t, q_flat, phi_flat, min_count, sigma_min_sq):
+        """Total log-likelihood for each (q_flat[k], phi_flat[k]) (compiled by XLA).
+
+        Z_t, E_t and valid_t are the packed arrays transposed to (T_max, n_papers)
+        so the filter can scan over time with a vector of papers as its state.
+        """
+        first = jnp.arange(Z_t.shape[0]) == 0
 
-        total_log_lik += log_lik
+        def total(q, phi):
+            def step(carry, obs):
+                x, P, log_lik = carry
+                z, e, mask, is_first = obs
 
-    return total_log_lik
+                # Observation variance for this time slice only; building it
+                # for all of E_t up front would, under vmap, allocate a
+                # (cells, T_max, n_papers) array
+                R = phi / (e + min_count) + sigma_min_sq
+
+                # Predict
+                P_pred = jnp.where(is_first, P, P + q)
+
+                # Innovation and log-likelihood
+                y = z - x
+                S = P_pred + R
+                log_lik = log_lik - 0.5 * mask * (LOG_2PI + jnp.log(S) + y * y / S)
+
+                # Update
+                K = P_pred / S
+                return (x + K * y, P_pred - K * P_pred, log_lik), None
+
+            # Prior: x0_mean = first observation, x0_var = 1
+            init = (Z_t[0], jnp.ones_like(Z_t[0]), jnp.zeros_like(Z_t[0]))
+            (_, _, log_lik), _ = jax.lax.scan(step, init, (Z_t, E_t, valid_t, first))
+            return log_lik.sum()
+
+        return jax.vmap(total)(q_flat, phi_flat)
+
+
+def jax_accelerated() -> bool:
+    """Whether JAX is installed and has a GPU or TPU to run on."""
+    return HAS_JAX and jax.default_backend() != "cpu"
+
+
+def _evaluate_grid_jax(
+    packed: PackedPapers,
+    min_count: float,
+    q_grid: np.ndarray,
+    phi_grid: np.ndarray,
+    sigma_min_sq: float = 0.01,
+) -> np.ndarray:
+    """Evaluate the whole grid in one JAX call, vectorized over (q, φ) pairs."""
+    q_mesh, phi_mesh = np.meshgrid(q_grid, phi_grid, indexing="ij")
+    log_lik = _jax_grid_core(
+        jnp.asarray(packed.Z.T),
+        jnp.asarray(packed.E.T),
+        jnp.asarray(packed.valid.T, dtype=jnp.float32),
+        jnp.asarray(q_mesh.ravel(), dtype=jnp.float32),
+        jnp.asarray(phi_mesh.ravel(), dtype=jnp.float32),
+        np.float32(min_count),
+        np.float32(sigma_min_sq),
+    )
+    return np.asarray(log_lik, dtype=np.float64).reshape(q_mesh.shape)
+
+
+def _evaluate_grid(
+    packed: PackedPapers,
+    min_count: float,
+    q_grid: np.ndarray,
+    phi_grid: np.ndarray,
+    use_jax: bool = False,
+) -> np.ndarray:
+    """Evaluate the total log-likelihood at every (q, φ) grid point.
+
+    Returns:
+        Array of shape (len(q_grid), len(phi_grid)).
+    """
+    if use_jax and len(packed) > 0:
+        return _evaluate_grid_jax(packed, min_count, q_grid, phi_grid)
+
+    Z, E, valid = packed.Z, packed.E, packed.valid
+    log_lik_grid = np.zeros((len(q_grid), len(phi_grid)))
+    q_grid_f32 = q_grid.astype(np.float32)
+
+    # R_t depends on φ but not q, so sweep q inside each φ and compute it once
+    for j, phi in enumerate(phi_grid):
+        R = compute_obs_variance(E, phi, min_count).astype(np.float32, copy=False)
+
+        if HAS_NUMBA and len(Z) > 0:
+            _q_sweep_core(Z, R, valid, q_grid_f32, log_lik_grid[:, j])
+        else:
+            for i, q in enumerate(q_grid):
+                log_lik_grid[i, j] = compute_total_log_likelihood(
+                    packed, q, phi, min_count, R=R
+                )
+
+    return log_lik_grid
 
 
 def grid_search(
-    papers_data: list[tuple[np.ndarray, np.ndarray]],
+    packed: PackedPapers,
     min_count: float,
-    n_grid: int = 40,
+    n_grid: int = 10,
+    refine: bool = True,
+    use_jax: Optional[bool] = None,
 ) -> tuple[float, float, float, np.ndarray]:
-    """Perform grid search over process_var and overdispersion.
+    """Perform coarse-to-fine grid search over process_var and overdispersion.
+
+    A coarse n_grid x n_grid log-spaced sweep finds the best cell, then a
+    second n_grid x n_grid sweep covers one coarse step either side of it.
+    The likelihood surface is smooth and unimodal in practice, so two 10x10
+    passes match the precision of one 40x40 pass.
 
     Args:
-        papers_data: List of (z, empirical_rate) tuples.
+        packed: Papers from pack_paper_data.
         min_count: Pseudocount for log transform.
-        n_grid: Number of grid points per dimension.
+        n_grid: Number of grid points per dimension in each pass.
+        refine: Run the fine pass; if False, only the coarse sweep is done.
+        use_jax: Evaluate grids with JAX; by default only when jax_accelerated().
 
     Returns:
-        Tuple of (best_q, best_phi, best_log_lik, log_lik_grid).
+        Tuple of (best_q, best_phi, best_log_lik, log_lik_grid), where
+        log_lik_grid comes from the last pass.
     """
     # Grid ranges from design doc
     # q in exp(linspace(-3, 1, n)) ≈ 0.05 to 2.7
     # φ in exp(linspace(-1, 2, n)) ≈ 0.37 to 7.4
-    q_grid = np.exp(np.linspace(-3, 1, n_grid))
-    phi_grid = np.exp(np.linspace(-1, 2, n_grid))
-
-    log_lik_grid = np.zeros((n_grid, n_grid))
-
-    best_log_lik = -np.inf
-    best_q = q_grid[0]
-    best_phi = phi_grid[0]
-
-    print(f"Running grid search over {n_grid}x{n_grid} = {n_grid**2} parameter combinations...")
+    if use_jax is None:
+        use_jax = jax_accelerated()
+
+    log_q_lo, log_q_hi = -3.0, 1.0
+    log_phi_lo, log_phi_hi = -1.0, 2.0
+    log_q_grid = np.linspace(log_q_lo, log_q_hi, n_grid)
+    log_phi_grid = np.linspace(log_phi_lo, log_phi_hi, n_grid)
+
+    n_passes = 2 if refine else 1
+    print(
+        f"Running grid search over {n_passes} x {n_grid}x{n_grid} = "
+        f"{n_passes * n_grid**2} parameter combinations..."
+    )
 
-    for i, q in enumerate(q_grid):
-        for j, phi in enumerate(phi_grid):
-            log_lik = compute_total_log_likelihood(
-                papers_data, q, phi, min_count
-            )
-            log_lik_grid[i, j] = log_lik
+    log_lik_grid = _evaluate_grid(
+        packed, min_count, np.exp(log_q_grid), np.exp(log_phi_grid), use_jax
+    )
+    # First maximum in (q, φ) order, as the serial scan would pick
+    i, j = np.unravel_index(np.argmax(log_lik_grid), log_lik_grid.shape)
+
+    if refine:
+        print(f"  Coarse optimum q={math.exp(log_q_grid[i]):.4f}, φ={math.exp(log_phi_grid[j]):.4f}; refining...")
+
+        # One coarse step either side of the optimum, kept within the ranges
+        q_step = (log_q_hi - log_q_lo) / max(n_grid - 1, 1)
+        phi_step = (log_phi_hi - log_phi_lo) / max(n_grid - 1, 1)
+        log_q_grid = np.linspace(
+            max(log_q_grid[i] - q_step, log_q_lo),
+            min(log_q_grid[i] + q_step, log_q_hi),
+            n_grid,
+        )
+        log_phi_grid = np.linspace(
+            max(log_phi_grid[j] - phi_step, log_phi_lo),
+            min(log_phi_grid[j] + phi_step, log_phi_hi),
+            n_grid,
+        )
 
-            if log_lik > best_log_lik:
-                best_log_lik = log_lik
-                best_q = q
-                best_phi = phi
+        log_lik_grid = _evaluate_grid(
+            packed, min_count, np.exp(log_q_grid), np.exp(log_phi_grid), use_jax
+        )
+        i, j = np.unravel_index(np.argmax(log_lik_grid), log_lik_grid.shape)
 
-        # Progress indicator
-        if (i + 1) % 10 == 0:
-            print(f"  Completed {i + 1}/{n_grid} rows...")
+    best_q = math.exp(log_q_grid[i])
+    best_phi = math.exp(log_phi_grid[j])
+    best_log_lik = float(log_lik_grid[i, j])
 
     return best_q, best_phi, best_log_lik, log_lik_grid
 
@@ -192,40 +424,57 @@ def main() -> None:
     parser.add_argument(
         "--n-grid",
         type=int,
-        default=40,
-        help="Number of grid points per dimension (default: 40)",
+        default=10,
+        help="Number of grid points per dimension in each pass (default: 10)",
+    )
+    parser.add_argument(
+        "--no-refine",
+        action="store_true",
+        help="Run only the coarse grid, skipping the fine pass around its optimum",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "jax", "cpu"],
+        default="auto",
+        help="Grid evaluation backend; auto uses JAX only on a GPU/TPU (default: auto)",
     )
 
     args = parser.parse_args()
 
+    if args.backend == "jax" and not HAS_JAX:
+        parser.error("--backend jax requires jax to be installed")
+    use_jax = {"auto": None, "jax": True, "cpu": False}[args.backend]
+
     # Load input
     print(f"Loading {args.input}...")
-    with open(args.input) as f:
-        data = json.load(f)
-
-    # Parse scraped_at
-    scraped_at = parse_scraped_at(data["scraped_at"])
-    print(f"Data scraped at: {scraped_at}")
-
-    # Prepare data for all papers
-    papers = data.get("papers", [])
-    print(f"Preparing data for {len(papers)} papers...")
-
-    papers_data = []
-    for paper in papers:
-        result = prepare_paper_data(paper, scraped_at, args.min_count)
-        if result is not None:
-            papers_data.append(result)
-
-    print(f"  {len(papers_data)} papers have citation data")
-
-    # Count papers with sufficient data
-    n_valid = sum(1 for z, _ in papers_data if len(z) >= 2)
+    with open(args.input, "rb") as f:
+        header, papers = load_citations(f)
+
+        # Parse scraped_at
+        scraped_at = parse_scraped_at(header["scraped_at"])
+        exposure_frac = compute_exposure_fraction(scraped_at)
+        print(f"Data scraped at: {scraped_at}")
+
+        # Prepare data paper by paper as it is read
+        print("Preparing paper data...")
+        n_papers = 0
+        papers_data = []
+        for paper in papers:
+            n_papers += 1
+            result = prepare_paper_data(paper, scraped_at, args.min_count, exposure_frac)
+            if result is not None:
+                papers_data.append(result)
+
+    print(f"  {len(papers_data)} of {n_papers} papers have citation data")
+
+    # Pack papers with sufficient data for batched filtering
+    packed = pack_paper_data(papers_data)
+    n_valid = len(packed)
     print(f"  {n_valid} papers have >= 2 years of data")
 
     # Run grid search
     best_q, best_phi, best_log_lik, _ = grid_search(
-        papers_data, args.min_count, args.n_grid
+        packed, args.min_count, args.n_grid, refine=not args.no_refine, use_jax=use_jax
     )
 
     print(f"\nOptimal hyperparameters:")
@@ -240,6 +489,7 @@ def main() -> None:
         "n_papers_with_2plus_years": n_valid,
         "min_count": args.min_count,
         "n_grid": args.n_grid,
+        "refine": not args.no_refine,
         "optimal": {
             "process_var": best_q,
             "overdispersion": best_phi,
@@ -249,8 +499,8 @@ def main() -> None:
 
     # Write output
     print(f"\nWriting {args.output}...")
-    with open(args.output, "w") as f:
-        json.dump(result, f, indent=2)
+    with open(args.output, "wb") as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
     print("Done!")
 
@@ -0,0 +1,89 @@
+"""Check citations.json reading and the streamed JSON writers."""
+
+import io
+
+import numpy as np
+import orjson
+import pytest
+
+from model import _io
+from model.rates import JSON_OPTIONS, write_json_stream, write_ndjson_stream
+
+HEADER = {
+    "user_id": "RIi-1pAAAAAJ",
+    "scraped_at": "2025-12-25T12:00:00+00:00",
+    "model": {"type": "kalman", "process_var": 0.25, "min_count": 1.0},
+}
+
+CITATIONS = [
+    {"title": "Paper A", "total_citations": 3, "citations_by_year": {"2021": 1, "2022": 2}},
+    {"title": "Paper B", "total_citations": 0, "citations_by_year": {}},
+]
+
+
+def make_papers(n):
+    """Analyzed-paper dicts with the NumPy arrays analyze_paper returns."""
+    return [
+        {
+            "title": f"Paper {i}",
+            "years": np.arange(2020, 2023, dtype=np.int32),
+            "observed_citations": np.array([1.0, 4.0, i], dtype=np.float64),
+            "smoothed_rate": np.array([1.5, 3.25, 2.0], dtype=np.float32),
+            "empty": [],
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [0, 1, 5])
+def test_json_stream_matches_dumps(n):
+    papers = make_papers(n)
+    f = io.BytesIO()
+
+    assert write_json_stream(f, HEADER, iter(papers)) == n
+    assert f.getvalue() == orjson.dumps({**HEADER, "papers": papers}, option=JSON_OPTIONS)
+
+
+@pytest.mark.parametrize("n", [0, 1, 5])
+def test_ndjson_stream_writes_header_then_papers(n):
+    papers = make_papers(n)
+    f = io.BytesIO()
+
+    assert write_ndjson_stream(f, HEADER, iter(papers)) == n
+    lines = f.getvalue().splitlines()
+    assert len(lines) == n + 1
+    assert orjson.loads(lines[0]) == HEADER
+    for line, paper in zip(lines[1:], papers):
+        assert line == orjson.dumps(paper, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+@pytest.fixture(params=[True, False], ids=["ijson", "orjson"])
+def use_ijson(request, monkeypatch):
+    """Run a test through both load_citations paths."""
+    if request.param and not _io.HAS_IJSON:
+        pytest.skip("ijson not installed")
+    monkeypatch.setattr(_io, "HAS_IJSON", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "layout",
+    [
+        {"user_id": "u", "scraped_at": "s", "papers": CITATIONS, "extra": 1},
+        {"papers": CITATIONS, "extra": 1, "scraped_at": "s", "user_id": "u"},
+        {"user_id": "u", "extra": 1, "papers": CITATIONS, "scraped_at": "s"},
+    ],
+    ids=["header-first", "papers-first", "papers-between"],
+)
+def test_load_citations(use_ijson, layout):
+    header, papers = _io.load_citations(io.BytesIO(orjson.dumps(layout)))
+
+    assert header == {"user_id": "u", "scraped_at": "s"}
+    assert list(papers) == CITATIONS
+
+
+def test_load_citations_without_papers(use_ijson):
+    header, papers = _io.load_citations(io.BytesIO(b'{"user_id": "u", "scraped_at": "s"}'))
+
+    assert header == {"user_id": "u", "scraped_at": "s"}
+    assert list(papers) == []
@@ -0,0 +1,167 @@
+"""Check the float32 smoothers and tuning likelihood against a float64 reference."""
+
+import numpy as np
+import pytest
+
+from model.kalman import (
+    kalman_filter_1d,
+    kalman_smoother_1d,
+    kalman_smoother_1d_scan,
+    kalman_smoother_batch,
+    kalman_smoother_short,
+)
+from model import tune
+
+RTOL = 1e-4
+ATOL = 1e-6
+
+
+def reference_smoother(z, process_var, obs_var, x0_mean, x0_var=1.0):
+    """Textbook float64 Kalman filter and RTS smoother for the local-level model."""
+    z = np.asarray(z, dtype=np.float64)
+    T = len(z)
+    R = np.broadcast_to(np.asarray(obs_var, dtype=np.float64), (T,))
+
+    x_pred = np.zeros(T)
+    P_pred = np.zeros(T)
+    x_filt = np.zeros(T)
+    P_filt = np.zeros(T)
+    log_lik = 0.0
+
+    for t in range(T):
+        if t == 0:
+            x_pred[t], P_pred[t] = x0_mean, x0_var
+        else:
+            x_pred[t], P_pred[t] = x_filt[t - 1], P_filt[t - 1] + process_var
+
+        S = P_pred[t] + R[t]
+        y = z[t] - x_pred[t]
+        log_lik -= 0.5 * (np.log(2 * np.pi) + np.log(S) + y * y / S)
+
+        K = P_pred[t] / S
+        x_filt[t] = x_pred[t] + K * y
+        P_filt[t] = (1 - K) * P_pred[t]
+
+    x_smooth = x_filt.copy()
+    P_smooth = P_filt.copy()
+    for t in range(T - 2, -1, -1):
+        C = P_filt[t] / P_pred[t + 1]
+        x_smooth[t] = x_filt[t] + C * (x_smooth[t + 1] - x_pred[t + 1])
+        P_smooth[t] = P_filt[t] + C * C * (P_smooth[t + 1] - P_pred[t + 1])
+
+    return x_smooth, P_smooth, log_lik
+
+
+def make_corpus(lengths, min_count=1.0, seed=0):
+    """(z, empirical_rate) pairs like prepare_paper_data returns, one per length."""
+    rng = np.random.default_rng(seed)
+    papers = []
+    for T in lengths:
+        e = np.round(np.exp(2.0 + np.cumsum(rng.normal(0, 0.5, T))))
+        papers.append((np.log(e + min_count), e))
+    return papers
+
+
+def make_series(T, seed=0):
+    """Random-walk log-rates with Poisson-like observation variances."""
+    rng = np.random.default_rng(seed)
+    z = 2.0 + np.cumsum(rng.normal(0, 0.4, T))
+    R = 0.56 / (np.exp(z) + 0.5) + 0.01
+    return z, R
+
+
+@pytest.mark.parametrize("T", [1, 2, 3, 10, 50, 200])
+@pytest.mark.parametrize("scalar_R", [False, True])
+def test_smoother_matches_reference(T, scalar_R):
+    z, R = make_series(T)
+    obs_var = 0.3 if scalar_R else R
+    x_ref, P_ref, _ = reference_smoother(z, 0.25, obs_var, z[0])
+
+    x, P = kalman_smoother_1d(z, 0.25, obs_var, z[0])
+    np.testing.assert_allclose(x, x_ref, rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(P, P_ref, rtol=RTOL, atol=ATOL)
+
+
+@pytest.mark.parametrize("T", [1, 2, 3, 10, 64, 200, 1000])
+def test_scan_smoother_matches_reference(T):
+    z, R = make_series(T, seed=1)
+    # A prior mean away from z[0] exercises the first filtering element
+    x_ref, P_ref, _ = reference_smoother(z, 0.1, R, z[0] + 0.5, x0_var=2.0)
+
+    x, P = kalman_smoother_1d_scan(z, 0.1, R, z[0] + 0.5, x0_var=2.0)
+    np.testing.assert_allclose(x, x_ref, rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(P, P_ref, rtol=RTOL, atol=ATOL)
+
+
+@pytest.mark.parametrize("T", [1, 2])
+def test_short_series_matches_reference(T):
+    z, R = make_series(T, seed=2)
+    x_ref, P_ref, _ = reference_smoother(z, 0.25, R, z[0])
+
+    x, P = kalman_smoother_short(z, R, 0.25)
+    np.testing.assert_allclose(x, x_ref, rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(P, P_ref, rtol=RTOL, atol=ATOL)
+
+
+def test_batch_smoother_matches_reference():
+    lengths = np.array([1, 2, 5, 30, 17])
+    series = [make_series(T, seed=i) for i, T in enumerate(lengths)]
+
+    Z = np.zeros((len(lengths), lengths.max()))
+    R = np.ones_like(Z)
+    for i, (z, r) in enumerate(series):
+        Z[i, : len(z)] = z
+        R[i, : len(r)] = r
+
+    x, P = kalman_smoother_batch(Z, 0.25, R, Z[:, 0], lengths)
+
+    for i, (z, r) in enumerate(series):
+        T = len(z)
+        x_ref, P_ref, _ = reference_smoother(z, 0.25, r, z[0])
+        np.testing.assert_allclose(x[i, :T], x_ref, rtol=RTOL, atol=ATOL)
+        np.testing.assert_allclose(P[i, :T], P_ref, rtol=RTOL, atol=ATOL)
+        assert not x[i, T:].any() and not P[i, T:].any()
+
+
+def test_filter_log_likelihood_matches_reference():
+    z, R = make_series(200, seed=3)
+    _, _, log_lik_ref = reference_smoother(z, 0.25, R, z[0])
+
+    *_, log_lik = kalman_filter_1d(z, 0.25, R, z[0])
+    assert log_lik == pytest.approx(log_lik_ref, rel=RTOL)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_total_log_likelihood_matches_reference(monkeypatch, use_numba):
+    if not use_numba:
+        monkeypatch.setattr(tune, "HAS_NUMBA", False)
+
+    q, phi, min_count = 0.2, 0.8, 1.0
+    # One-year papers are dropped by pack_paper_data and add nothing
+    papers = make_corpus([1, 2, 5, 1, 30, 12], min_count)
+
+    log_lik_ref = sum(
+        reference_smoother(z, q, phi / (e + min_count) + 0.01, z[0])[2]
+        for z, e in papers
+        if len(z) >= 2
+    )
+
+    packed = tune.pack_paper_data(papers)
+    assert len(packed) == 4
+    log_lik = tune.compute_total_log_likelihood(packed, q, phi, min_count)
+    assert log_lik == pytest.approx(log_lik_ref, rel=RTOL)
+
+
+def test_jax_grid_matches_cpu_grid():
+    pytest.importorskip("jax")
+
+    min_count = 1.0
+    packed = tune.pack_paper_data(make_corpus([1, 2, 3, 8, 25, 4, 13], min_count, seed=1))
+    q_grid = np.exp(np.linspace(np.log(0.01), np.log(2.0), 5))
+    phi_grid = np.exp(np.linspace(np.log(0.1), np.log(5.0), 4))
+
+    log_lik_cpu = tune._evaluate_grid(packed, min_count, q_grid, phi_grid, use_jax=False)
+    log_lik_jax = tune._evaluate_grid_jax(packed, min_count, q_grid, phi_grid)
+
+    np.testing.assert_allclose(log_lik_jax, log_lik_cpu, rtol=RTOL)
+    assert np.argmax(log_lik_jax) == np.argmax(log_lik_cpu)
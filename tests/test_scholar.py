@@ -0,0 +1,72 @@
+"""Check the scraper's parsing against saved Scholar page fragments."""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from ingest import scholar
+
+FIXTURES = Path(__file__).parent / "fixtures"
+FETCHED_AT = datetime(2023, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def serve_page(monkeypatch):
+    """Make fetch_html return a fixture page instead of hitting Scholar."""
+
+    def serve(name):
+        content = (FIXTURES / name).read_bytes()
+        monkeypatch.setattr(scholar, "fetch_html", lambda url, use_cache=True: (content, FETCHED_AT))
+
+    return serve
+
+
+def test_bar_regex_matches_histogram():
+    content = (FIXTURES / "citation_page.html").read_bytes()
+    bars = {year.decode(): int(count) for year, count in scholar._BAR_RE.findall(content)}
+    # 2021's bar has no count span, so it's skipped like the old span.gsc_oci_g_al selector did
+    assert bars == {"2019": 4, "2020": 28, "2022": 12, "2023": 29}
+
+
+def test_bar_regex_requires_whole_class_name():
+    content = (
+        b'<a href="/scholar?as_ylo=2020&amp;as_yhi=2020" class="gsc_oci_g_a">'
+        b'<span class="gsc_oci_g_al_x">5</span></a>'
+    )
+    assert scholar._BAR_RE.findall(content) == []
+
+
+def test_bar_regex_rejects_year_ranges():
+    content = (
+        b'<a href="/scholar?as_ylo=2019&amp;as_yhi=2020" class="gsc_oci_g_a">'
+        b'<span class="gsc_oci_g_al">5</span></a>'
+    )
+    assert scholar._BAR_RE.findall(content) == []
+
+
+def test_fetch_paper_citations(serve_page):
+    serve_page("citation_page.html")
+    paper = scholar.fetch_paper_citations("RIi-1pAAAAAJ", "RIi-1pAAAAAJ:u5HHmVD_uO8C")
+
+    assert paper.title == "Seasonal influenza & antigenic drift"
+    assert paper.citation_id == "RIi-1pAAAAAJ:u5HHmVD_uO8C"
+    assert paper.total_citations == 73
+    assert paper.citations_by_year == {"2019": 4, "2020": 28, "2022": 12, "2023": 29}
+    assert paper.fetched_at == FETCHED_AT
+
+
+def test_fetch_paper_list(serve_page):
+    serve_page("profile_page.html")
+    papers = scholar.fetch_paper_list("RIi-1pAAAAAJ", delay=0)
+
+    assert papers == [
+        {
+            "title": "Seasonal influenza & antigenic drift",
+            "citation_id": "RIi-1pAAAAAJ:u5HHmVD_uO8C",
+        },
+        {
+            "title": "Phylodynamics of H3N2",
+            "citation_id": "RIi-1pAAAAAJ:d1gkVwhDpl0C",
+        },
+    ]